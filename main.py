@@ -4,25 +4,106 @@ PDF Merger Tool with Debugging
 Merges multiple PDF files into a single PDF file
 """
 
+import io
 import os
 import sys
 import time
+import queue
+import shutil
 import logging
+import tempfile
+import subprocess
+from dataclasses import dataclass
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from PyPDF2 import PdfReader, PdfWriter
+from concurrent.futures import ThreadPoolExecutor
+from pypdf import PdfReader, PdfWriter
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# The qpdf command-line tool, used for merging when pikepdf isn't available
+QPDF_EXECUTABLE = shutil.which('qpdf')
+
+# pypdf's writer issues many small write() calls per object, so the output
+# goes through a larger buffer than Python's default 8 KiB
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+# Set to True to fsync the merged PDF before reporting success
+FSYNC_OUTPUT = False
+
+# Input files pikepdf keeps open before saving an intermediate batch, used
+# only where the open-file limit can't be queried (e.g. Windows)
+MAX_OPEN_SOURCES = 64
+
+# File descriptors left for the interpreter, the log file, the output and
+# the intermediate batch file when sizing batches from the open-file limit
+RESERVED_FDS = 32
+
+# Background thread that writes queued log records, started by setup_logging()
+_log_listener = None
+
+@dataclass(slots=True)
+class MergedFileInfo:
+    """Per-file details reported in the merge summary"""
+    filename: str
+    pages: int | None  # None when the backend doesn't report per-file counts
+    file_size: int
 
 def setup_logging():
     """Set up logging configuration"""
+    global _log_listener
+    
+    # Stop any listener left from an earlier call so its thread and log
+    # file aren't leaked
+    shutdown_logging()
+    
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    
+    # Full debug detail goes to the log file; the console only shows progress
+    file_handler = logging.FileHandler('pdf_merger_debug.log')
+    file_handler.setLevel(logging.DEBUG)
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setLevel(logging.INFO)
+    stream_handler.setFormatter(formatter)
+    
+    # Log calls only put the record on a queue; the file and console writes
+    # happen on the listener's thread instead of blocking the merge
+    log_queue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _log_listener.start()
+    
+    # The queued record only carries the message; the listener's handlers
+    # add the timestamp and level
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    
     logging.basicConfig(
         level=logging.DEBUG,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.FileHandler('pdf_merger_debug.log'),
-            logging.StreamHandler(sys.stdout)
-        ]
+        handlers=[queue_handler],
+        force=True
     )
     return logging.getLogger(__name__)
 
+def shutdown_logging():
+    """Flush queued log records and stop the logging thread"""
+    global _log_listener
+    
+    if _log_listener is not None:
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+
 def check_system_requirements():
     """Check if system has required components"""
     logger = logging.getLogger(__name__)
@@ -33,14 +114,23 @@ def check_system_requirements():
     python_version = sys.version_info
     logger.debug(f"Python version: {python_version.major}.{python_version.minor}.{python_version.micro}")
     
-    # Check if PyPDF2 is importable
+    # Check if pypdf is importable
     try:
-        import PyPDF2
-        logger.debug(f"PyPDF2 version: {PyPDF2.__version__}")
+        import pypdf
+        logger.debug(f"pypdf version: {pypdf.__version__}")
     except ImportError as e:
-        logger.error(f"PyPDF2 not installed: {e}")
+        logger.error(f"pypdf not installed: {e}")
         return False
     
+    # pikepdf provides the compiled merge kernel; pypdf is the pure-Python fallback
+    if pikepdf is not None:
+        logger.debug(f"pikepdf version: {pikepdf.__version__} (using native QPDF backend)")
+    elif QPDF_EXECUTABLE is not None:
+        # Without pikepdf, an installed qpdf binary still gives a native merge
+        logger.warning(f"pikepdf not installed, using the qpdf command-line tool: {QPDF_EXECUTABLE}")
+    else:
+        logger.warning("pikepdf not installed, falling back to the slower pypdf backend")
+    
     return True
 
 def validate_directories(input_dir, output_dir):
@@ -48,8 +138,8 @@ def validate_directories(input_dir, output_dir):
     logger = logging.getLogger(__name__)
     
     logger.info("Validating directories...")
-    logger.debug(f"Input directory path: {input_dir.absolute()}")
-    logger.debug(f"Output directory path: {output_dir.absolute()}")
+    logger.debug("Input directory path: %s", input_dir)
+    logger.debug("Output directory path: %s", output_dir)
     
     # Create directories if they don't exist
     for directory in [input_dir, output_dir]:
@@ -76,62 +166,108 @@ def validate_directories(input_dir, output_dir):
     logger.info("Directory validation completed successfully")
     return True
 
+def _read_into(buffer, path):
+    """Read a whole file into a reusable BytesIO and rewind it"""
+    with open(path, 'rb') as fh:
+        size = os.fstat(fh.fileno()).st_size
+        
+        # Resize the buffer in place; it only reallocates when it has to grow
+        # (or shrinks to well under half its size)
+        buffer.seek(0)
+        buffer.truncate(size)
+        if buffer.seek(0, io.SEEK_END) < size:
+            buffer.seek(size - 1)
+            buffer.write(b'\0')
+        
+        with buffer.getbuffer() as view:
+            read = fh.readinto(view)
+    
+    # The file may have shrunk since it was stat'ed
+    buffer.truncate(read)
+    buffer.seek(0)
+    return buffer
+
+def _read_ahead(paths):
+    """Yield (path, future) pairs, keeping the next file's read in flight
+    
+    Each future resolves to one of two BytesIO buffers that are reused for
+    the whole run, so a file's buffer is only valid until the next iteration.
+    """
+    # Two buffers are enough: one being parsed, one being filled
+    buffers = (io.BytesIO(), io.BytesIO())
+    
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        pending = ex.submit(_read_into, buffers[0], paths[0]) if paths else None
+        for i, path in enumerate(paths):
+            current = pending
+            if i + 1 < len(paths):
+                pending = ex.submit(_read_into, buffers[(i + 1) % 2], paths[i + 1])
+            # The future is handed over unresolved so read errors surface
+            # in the caller's per-file error handling
+            yield path, current
+
+def _has_pdf_header(path):
+    """Check for a %PDF- header without parsing the file"""
+    # The header may follow some leading junk, so look within the first KiB
+    with open(path, 'rb') as fh:
+        return b'%PDF-' in fh.read(1024)
+
 def find_and_validate_pdf_files(input_dir):
     """Find and validate PDF files"""
     logger = logging.getLogger(__name__)
     
     logger.info("Searching for PDF files...")
     
-    # Find all PDF files
-    pdf_files = list(input_dir.glob("*.pdf"))
-    logger.debug(f"Found {len(pdf_files)} PDF files")
-    
-    if not pdf_files:
+    # Find all PDF files in a single directory pass; DirEntry caches the
+    # file type and stat results, so only symlinks need an extra stat to
+    # resolve their target
+    with os.scandir(input_dir) as it:
+        entries = list(it)
+    pdf_entries = [
+        entry for entry in entries
+        if entry.is_file() and entry.name.lower().endswith('.pdf')
+    ]
+    logger.debug("Found %d PDF files", len(pdf_entries))
+    
+    if not pdf_entries:
         logger.warning("No PDF files found")
-        all_files = list(input_dir.glob("*"))
-        logger.debug(f"All files in directory: {[f.name for f in all_files]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("All files in directory: %s", [entry.name for entry in entries])
         return []
     
     # Validate each file
     valid_files = []
-    for pdf_file in pdf_files:
-        logger.debug(f"Validating file: {pdf_file.name}")
+    for entry in pdf_entries:
+        pdf_file = Path(entry.path)
+        logger.debug("Validating file: %s", pdf_file.name)
         
-        # Check if file is accessible
-        if not pdf_file.exists():
-            logger.warning(f"File doesn't exist: {pdf_file.name}")
-            continue
-            
-        if not os.access(pdf_file, os.R_OK):
-            logger.warning(f"No read permission for file: {pdf_file.name}")
+        # Check if file is accessible (scandir already proved it exists)
+        if not os.access(entry.path, os.R_OK):
+            logger.warning("No read permission for file: %s", pdf_file.name)
             continue
             
         # Check file size
-        file_size = pdf_file.stat().st_size
-        logger.debug(f"File size: {file_size} bytes ({file_size / 1024:.2f} KB)")
+        file_size = entry.stat().st_size
+        logger.debug("File size: %d bytes (%.2f KB)", file_size, file_size / 1024)
         
         if file_size == 0:
-            logger.warning(f"File is empty: {pdf_file.name}")
+            logger.warning("File is empty: %s", pdf_file.name)
             continue
         
-        # Try to open the PDF to check if it's valid
+        # Only the header is read here, so stray non-PDF files don't count
+        # towards the merge/copy decision; the full parse happens in the merge
         try:
-            reader = PdfReader(str(pdf_file))
-            page_count = len(reader.pages)
-            logger.debug(f"PDF pages: {page_count}")
-            
-            if page_count == 0:
-                logger.warning(f"PDF has no pages: {pdf_file.name}")
+            if not _has_pdf_header(entry.path):
+                logger.warning("Invalid PDF file: %s - missing %%PDF- header", pdf_file.name)
                 continue
-                
-            valid_files.append(pdf_file)
-            logger.debug(f"File validated: {pdf_file.name}")
-            
-        except Exception as e:
-            logger.warning(f"Invalid PDF file: {pdf_file.name} - {str(e)}")
+        except OSError as e:
+            logger.warning("Invalid PDF file: %s - %s", pdf_file.name, e)
             continue
+        
+        valid_files.append((pdf_file, file_size))
+        logger.debug("File validated: %s", pdf_file.name)
     
-    logger.info(f"Validation complete: {len(valid_files)} valid files out of {len(pdf_files)} found")
+    logger.info("Validation complete: %d valid files out of %d found", len(valid_files), len(pdf_entries))
     return valid_files
 
 def sort_files_by_preference(pdf_files):
@@ -139,95 +275,279 @@ def sort_files_by_preference(pdf_files):
     logger = logging.getLogger(__name__)
     
     logger.info("Sorting PDF files alphabetically...")
-    sorted_files = sorted(pdf_files, key=lambda x: x.name.lower())
+    sorted_files = sorted(pdf_files, key=lambda t: t[0].name.casefold())
     
     logger.info("File order for merging:")
-    for i, pdf_file in enumerate(sorted_files, 1):
-        logger.info(f"  {i}. {pdf_file.name}")
+    for i, (pdf_file, _) in enumerate(sorted_files, 1):
+        logger.info("  %d. %s", i, pdf_file.name)
     
     return sorted_files
 
-def merge_pdf_files(pdf_files, output_file):
-    """Merge multiple PDF files into one"""
+def _merge_with_pypdf(pdf_files, output_file):
+    """Merge PDF files with pypdf"""
     logger = logging.getLogger(__name__)
     
-    logger.info(f"Starting PDF merge process...")
-    logger.info(f"Output file: {output_file.name}")
-    
-    start_time = time.time()
     writer = PdfWriter()
+    total_pages = 0
+    file_info = []
+    
+    # pypdf parses from memory, so the next file is read on a background
+    # thread while the current one is parsed
+    pending_reads = _read_ahead([pdf_file for pdf_file, _ in pdf_files])
+    
+    for i, ((pdf_file, file_size), (_, pending)) in enumerate(zip(pdf_files, pending_reads), 1):
+        logger.info("[%d/%d] Processing: %s", i, len(pdf_files), pdf_file.name)
+        
+        try:
+            # The reader must be finished with before the next iteration,
+            # since the buffer behind it gets refilled with a later file
+            reader = PdfReader(pending.result())
+            page_count = len(reader.pages)
+            
+            if page_count == 0:
+                logger.warning("PDF has no pages: %s", pdf_file.name)
+                continue
+            
+            logger.debug("Adding %d pages from %s", page_count, pdf_file.name)
+            
+            # Add all pages from this PDF in a single pass
+            writer.append(reader)
+            reader.close()
+            
+            total_pages += page_count
+            file_info.append(MergedFileInfo(pdf_file.name, page_count, file_size))
+            
+            logger.info("✓ Added %d pages from %s", page_count, pdf_file.name)
+            
+        except Exception as e:
+            logger.error("✗ Failed to process %s: %s", pdf_file.name, e)
+            continue
+    
+    # Inputs often embed the same fonts and images; collapse the identical
+    # copies append() made so they are stored and written only once
+    logger.debug("Deduplicating identical objects across input files")
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    
+    # Write the merged PDF
+    logger.info("Writing merged PDF with %d total pages...", total_pages)
+    
+    with open(output_file, 'wb', buffering=0) as raw, \
+            io.BufferedWriter(raw, buffer_size=OUTPUT_BUFFER_SIZE) as output_stream:
+        writer.write(output_stream)
+        output_stream.flush()
+        if FSYNC_OUTPUT:
+            os.fsync(raw.fileno())
+    
+    return total_pages, file_info
+
+def _max_open_sources():
+    """Return how many pikepdf sources may be held open at the same time"""
+    if resource is None:
+        return MAX_OPEN_SOURCES
     
+    logger = logging.getLogger(__name__)
+    
+    # Raise the soft limit to the hard limit first, so intermediate batch
+    # saves only happen when the process really is short of descriptors
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard != resource.RLIM_INFINITY and soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+            logger.debug("Raised open-file limit from %d to %d", soft, hard)
+            soft = hard
+        except (ValueError, OSError) as e:
+            logger.debug("Could not raise open-file limit: %s", e)
+    
+    return max(1, soft - RESERVED_FDS)
+
+def _save_pikepdf(pdf, path):
+    """Save a pikepdf document, passing streams through without re-encoding"""
+    pdf.save(
+        path,
+        linearize=False,
+        compress_streams=False,
+        stream_decode_level=pikepdf.StreamDecodeLevel.none
+    )
+
+def _merge_with_pikepdf(pdf_files, output_file):
+    """Merge PDF files with pikepdf (QPDF's C++ parser and writer)"""
+    logger = logging.getLogger(__name__)
+    
+    max_open = _max_open_sources()
+    out = pikepdf.Pdf.new()
+    sources = []
+    batch_file = None
     total_pages = 0
     file_info = []
     
     try:
-        for i, pdf_file in enumerate(pdf_files, 1):
-            logger.info(f"[{i}/{len(pdf_files)}] Processing: {pdf_file.name}")
+        for i, (pdf_file, file_size) in enumerate(pdf_files, 1):
+            logger.info("[%d/%d] Processing: %s", i, len(pdf_files), pdf_file.name)
+            
+            # QPDF copies foreign stream data lazily when saving, so every
+            # source has to stay open until the output is saved. Once too many
+            # are open, save the pages merged so far to a temporary file and
+            # carry on from that, which lets this batch's sources be closed.
+            if len(sources) >= max_open:
+                logger.debug("Saving intermediate batch of %d files", len(sources))
+                fd, next_batch_file = tempfile.mkstemp(
+                    prefix=f".{output_file.stem}-", suffix='.pdf', dir=output_file.parent
+                )
+                os.close(fd)
+                _save_pikepdf(out, next_batch_file)
+                
+                out.close()
+                for src in sources:
+                    src.close()
+                sources.clear()
+                if batch_file is not None:
+                    os.remove(batch_file)
+                
+                batch_file = next_batch_file
+                out = pikepdf.open(batch_file)
             
             try:
-                reader = PdfReader(str(pdf_file))
-                page_count = len(reader.pages)
+                src = pikepdf.open(pdf_file)
+                sources.append(src)
+                page_count = len(src.pages)
+                
+                if page_count == 0:
+                    logger.warning("PDF has no pages: %s", pdf_file.name)
+                    continue
                 
-                logger.debug(f"Adding {page_count} pages from {pdf_file.name}")
+                logger.debug("Adding %d pages from %s", page_count, pdf_file.name)
                 
-                # Add all pages from this PDF
-                for page_num in range(page_count):
-                    page = reader.pages[page_num]
-                    writer.add_page(page)
+                out.pages.extend(src.pages)
                 
                 total_pages += page_count
-                file_info.append({
-                    'filename': pdf_file.name,
-                    'pages': page_count,
-                    'file_size': pdf_file.stat().st_size
-                })
+                file_info.append(MergedFileInfo(pdf_file.name, page_count, file_size))
                 
-                logger.info(f"✓ Added {page_count} pages from {pdf_file.name}")
+                logger.info("✓ Added %d pages from %s", page_count, pdf_file.name)
                 
-            except Exception as e:
-                logger.error(f"✗ Failed to process {pdf_file.name}: {str(e)}")
+            except (pikepdf.PdfError, OSError) as e:
+                logger.error("✗ Failed to process %s: %s", pdf_file.name, e)
                 continue
         
         # Write the merged PDF
-        logger.info(f"Writing merged PDF with {total_pages} total pages...")
+        logger.info("Writing merged PDF with %d total pages...", total_pages)
         
-        with open(output_file, 'wb') as output_stream:
-            writer.write(output_stream)
+        _save_pikepdf(out, output_file)
         
-        end_time = time.time()
-        merge_time = round(end_time - start_time, 2)
+        # QPDF does its own buffered writes, so only the fsync is needed here
+        if FSYNC_OUTPUT:
+            with open(output_file, 'rb') as output_stream:
+                os.fsync(output_stream.fileno())
+    finally:
+        for src in sources:
+            src.close()
+        out.close()
+        if batch_file is not None:
+            os.remove(batch_file)
+    
+    return total_pages, file_info
+
+def _merge_with_qpdf(pdf_files, output_file):
+    """Merge PDF files by running the qpdf command-line tool"""
+    logger = logging.getLogger(__name__)
+    
+    logger.info("Merging %d files with qpdf...", len(pdf_files))
+    
+    # qpdf exits with 3 when it succeeded but printed warnings
+    command = [
+        QPDF_EXECUTABLE, '--empty',
+        '--pages', *[str(pdf_file) for pdf_file, _ in pdf_files], '--',
+        str(output_file)
+    ]
+    logger.debug("Running: %s", command)
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode not in (0, 3):
+        raise subprocess.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
+    if result.stderr:
+        logger.warning("qpdf: %s", result.stderr.strip())
+    
+    # qpdf doesn't report per-file page counts, only the merged total
+    npages = subprocess.run(
+        [QPDF_EXECUTABLE, '--show-npages', str(output_file)],
+        capture_output=True, text=True, check=True
+    )
+    total_pages = int(npages.stdout)
+    
+    file_info = [MergedFileInfo(pdf_file.name, None, file_size) for pdf_file, file_size in pdf_files]
+    
+    if FSYNC_OUTPUT:
+        with open(output_file, 'rb') as output_stream:
+            os.fsync(output_stream.fileno())
+    
+    return total_pages, file_info
+
+def merge_pdf_files(pdf_files, output_file):
+    """Merge multiple PDF files into one"""
+    logger = logging.getLogger(__name__)
+    
+    logger.info("Starting PDF merge process...")
+    logger.info("Output file: %s", output_file.name)
+    
+    start_ns = time.perf_counter_ns()
+    
+    try:
+        # Prefer the native QPDF backend when pikepdf is installed
+        if pikepdf is not None:
+            logger.debug("Merging with pikepdf")
+            total_pages, file_info = _merge_with_pikepdf(pdf_files, output_file)
+        elif QPDF_EXECUTABLE is not None:
+            # qpdf rejects the whole merge if any input is unreadable, so fall
+            # back to pypdf, which skips bad files individually; OSError covers
+            # a binary that can't be run and ValueError unparseable output
+            try:
+                total_pages, file_info = _merge_with_qpdf(pdf_files, output_file)
+            except (subprocess.CalledProcessError, OSError, ValueError) as e:
+                detail = (getattr(e, 'stderr', None) or '').strip() or e
+                logger.warning("qpdf merge failed (%s), retrying with pypdf", detail)
+                total_pages, file_info = _merge_with_pypdf(pdf_files, output_file)
+        else:
+            logger.debug("Merging with pypdf")
+            total_pages, file_info = _merge_with_pypdf(pdf_files, output_file)
         
-        # Verify output file
-        if output_file.exists():
-            output_size = output_file.stat().st_size
-            logger.info(f"✓ Merge completed successfully!")
-            logger.info(f"✓ Output file: {output_file.name}")
-            logger.info(f"✓ Total pages: {total_pages}")
-            logger.info(f"✓ Output size: {output_size} bytes ({output_size / 1024:.2f} KB)")
-            logger.info(f"✓ Merge time: {merge_time} seconds")
-            
+        merge_time = (time.perf_counter_ns() - start_ns) / 1e9
+        
+        # Every input failed to parse; don't report an empty PDF as a success
+        if not file_info:
+            logger.error("✗ None of the input files could be merged")
+            output_file.unlink(missing_ok=True)
             return {
-                'success': True,
-                'output_file': output_file.name,
-                'total_pages': total_pages,
-                'total_files': len(pdf_files),
-                'output_size': output_size,
-                'merge_time': merge_time,
-                'file_info': file_info
+                'success': False,
+                'error': 'No valid PDF files could be merged'
             }
-        else:
+        
+        # Verify output file; a single stat both proves it exists and gives its size
+        try:
+            output_size = output_file.stat().st_size
+        except FileNotFoundError:
             logger.error("Merge appeared to succeed but output file not found")
             return {
                 'success': False,
                 'error': 'Output file not created'
             }
+        
+        logger.info("✓ Merge completed successfully!")
+        logger.info("✓ Output file: %s", output_file.name)
+        logger.info("✓ Total pages: %d", total_pages)
+        logger.info("✓ Output size: %d bytes (%.2f KB)", output_size, output_size / 1024)
+        logger.info("✓ Merge time: %.2f seconds", merge_time)
+        
+        return {
+            'success': True,
+            'output_file': output_file.name,
+            'total_pages': total_pages,
+            'total_files': len(file_info),
+            'output_size': output_size,
+            'merge_time': merge_time,
+            'file_info': file_info
+        }
             
     except Exception as e:
-        end_time = time.time()
-        merge_time = round(end_time - start_time, 2)
-        
-        logger.error(f"✗ Merge failed: {str(e)}")
-        logger.error(f"Error type: {type(e).__name__}")
+        logger.error("✗ Merge failed: %s", e)
+        logger.error("Error type: %s", type(e).__name__)
         
         return {
             'success': False,
@@ -235,6 +555,28 @@ def merge_pdf_files(pdf_files, output_file):
             'error_type': type(e).__name__
         }
 
+def _copy_file(src, dst):
+    """Copy a file's contents, in-kernel where the platform supports it"""
+    # copy_file_range (Linux 4.5+) never moves the data through user space
+    # and can reflink on copy-on-write filesystems
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                # Copy until EOF rather than to the size seen at discovery,
+                # so a file that grew in the meantime isn't truncated
+                copied = 0
+                while n := os.copy_file_range(fsrc.fileno(), fdst.fileno(), 1 << 30):
+                    copied += n
+            # Some filesystems report EOF straight away instead of failing;
+            # the source is never empty here, so that means unsupported
+            if copied:
+                return
+        except OSError:
+            # e.g. unsupported filesystem or a cross-device copy on older kernels
+            pass
+    
+    shutil.copyfile(src, dst)
+
 def get_output_filename(input_dir):
     """Generate output filename based on input directory or user preference"""
     logger = logging.getLogger(__name__)
@@ -267,9 +609,9 @@ def merge_pdfs():
         logger.error("System requirements not met. Exiting.")
         return
     
-    # Define directories
-    input_dir = Path("input")
-    output_dir = Path("output")
+    # Define directories (resolved once; absolute() queries the working directory)
+    input_dir = Path("input").absolute()
+    output_dir = Path("output").absolute()
     
     # Validate directories
     if not validate_directories(input_dir, output_dir):
@@ -281,7 +623,7 @@ def merge_pdfs():
     
     if not pdf_files:
         logger.error("No valid PDF files found in the input directory!")
-        logger.info(f"Please place your PDF files in: {input_dir.absolute()}")
+        logger.info(f"Please place your PDF files in: {input_dir}")
         return
     
     if len(pdf_files) < 2:
@@ -289,12 +631,12 @@ def merge_pdfs():
         logger.info("If you want to copy the single file, it will be copied to output directory.")
         
         # Copy single file to output
-        single_file = pdf_files[0]
+        single_file, _ = pdf_files[0]
         output_file = output_dir / single_file.name
         
         try:
-            import shutil
-            shutil.copy2(single_file, output_file)
+            _copy_file(single_file, output_file)
+            shutil.copystat(single_file, output_file)
             logger.info(f"✓ Single file copied: {output_file.name}")
         except Exception as e:
             logger.error(f"✗ Failed to copy file: {str(e)}")
@@ -326,11 +668,14 @@ def print_merge_summary(result, logger):
         logger.info(f"✓ Total Files Merged: {result['total_files']}")
         logger.info(f"✓ Total Pages: {result['total_pages']}")
         logger.info(f"✓ Output Size: {result['output_size'] / 1024:.2f} KB")
-        logger.info(f"✓ Merge Time: {result['merge_time']} seconds")
+        logger.info(f"✓ Merge Time: {result['merge_time']:.2f} seconds")
         
         logger.info("\nFile Details:")
         for info in result['file_info']:
-            logger.info(f"  • {info['filename']}: {info['pages']} pages ({info['file_size'] / 1024:.2f} KB)")
+            if info.pages is None:
+                logger.info(f"  • {info.filename}: ({info.file_size / 1024:.2f} KB)")
+            else:
+                logger.info(f"  • {info.filename}: {info.pages} pages ({info.file_size / 1024:.2f} KB)")
     else:
         logger.error(f"✗ Merge Status: FAILED")
         logger.error(f"✗ Error: {result['error']}")
@@ -343,8 +688,10 @@ if __name__ == "__main__":
     try:
         merge_pdfs()
     except KeyboardInterrupt:
-        print("\nMerge cancelled by user.")
+        # Logged rather than printed so it reaches the console after the
+        # records still queued ahead of it
         logging.info("Merge cancelled by user")
     except Exception as e:
-        print(f"An unexpected error occurred: {str(e)}")
         logging.error(f"Unexpected error: {str(e)}", exc_info=True)
+    finally:
+        shutdown_logging()